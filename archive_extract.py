@@ -10,8 +10,7 @@ no external 7-Zip binary is required (finally, jeez)
 from __future__ import annotations
 
 import contextlib
-import shutil
-import tempfile
+import io
 from pathlib import Path
 from typing import BinaryIO
 
@@ -53,25 +52,28 @@ def open_member(archive_path: Path | str, member: str) -> BinaryIO:  # noqa: D40
                         break
                 else:
                     raise FileNotFoundError(member)
+            # no tempfile round-trip: read the member straight into memory;
+            # callers only need a readable/seekable binary object
             with src:
-                with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                    shutil.copyfileobj(src, tmp)
-                    tmp.flush()
-                    tmp.seek(0)
-                    try:
-                        yield open(tmp.name, "rb")  # type: ignore[abstract]
-                    finally:
-                        Path(tmp.name).unlink(missing_ok=True)
+                yield io.BytesIO(src.read())
     elif suffix == ".7z":
         if py7zr is None:
             raise UnsupportedArchiveError("py7zr is not installed; cannot read .7z archives")
         with py7zr.SevenZipFile(archive_path, mode="r") as zf:
-            # extract target to temp dir
-            with tempfile.TemporaryDirectory() as td:
-                zf.extract(targets=[member], path=td)
-                path = Path(td) / member
-                if not path.exists():
+            # read target in-memory; py7zr < 1.0 hands back {name: BytesIO}
+            # from read(), 1.x wants extract() with an in-memory factory
+            if hasattr(zf, "read"):
+                extracted = zf.read(targets=[member])
+                if not extracted or member not in extracted:
                     raise FileNotFoundError(member)
-                yield path.open("rb")
+                yield extracted[member]
+            else:
+                from py7zr.io import BytesIOFactory
+
+                factory = BytesIOFactory(limit=1 << 30)
+                zf.extract(targets=[member], factory=factory)
+                if member not in factory.products:
+                    raise FileNotFoundError(member)
+                yield factory.products[member]
     else:
         raise UnsupportedArchiveError(f"Unknown archive type: {archive_path}")
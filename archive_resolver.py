@@ -18,10 +18,12 @@ inclusive, i.e. ``fb2-000024-030559.7z`` contains ``LIBID`` 24 and 30559.
 from __future__ import annotations
 
 import bisect
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 __all__ = [
     "ArchiveResolver",
@@ -50,7 +52,8 @@ class ArchiveResolver:
         Path to directory that contains archive files and sub-directories
         ``covers`` and ``images``.
     cache: bool, default ``True``
-        Keep parsed lists in memory for fast re-use.
+        Ignored; kept for backwards compatibility.  The parsed lists are
+        O(number of archives), so they are always retained.
     """
 
     # regex matches optional leading char(s) before "fb2-" and extracts range
@@ -68,14 +71,6 @@ class ArchiveResolver:
 
         self._scan_archives()
 
-        if cache is False:
-            # allow GC to reclaim lists later if caller only needs one-off use
-            import weakref
-
-            self._book_archives = weakref.proxy(self._book_archives)  
-            self._cover_archives = weakref.proxy(self._cover_archives)  
-            self._image_archives = weakref.proxy(self._image_archives)  
-
     # public helpers
     def resolve_all(self, book_id: int) -> Dict[str, Optional[Path]]:
         """Return dictionary with keys ``fb2``, ``cover``, ``image``.
@@ -83,50 +78,156 @@ class ArchiveResolver:
         Any of the values may be *None* if a matching archive was not located.
         """
         return {
-            "fb2": self._find(book_id, self._book_archives),
-            "cover": self._find(book_id, self._cover_archives),
-            "image": self._find(book_id, self._image_archives),
+            "fb2": self._find(book_id, self._book_index),
+            "cover": self._find(book_id, self._cover_index),
+            "image": self._find(book_id, self._image_index),
         }
 
     # alias for compatibility – expected later by importer
     resolve = resolve_all
 
+    def resolve_many(self, book_ids: Iterable[int]) -> Dict[int, Dict[str, Optional[Path]]]:
+        """Resolve a whole batch of *book_ids* in one call.
+
+        Returns ``{book_id: resolve_all(book_id)}``.  Hoists the per-call
+        attribute lookups out of the loop so callers processing chunks (the
+        importer) pay them once per batch instead of once per row.
+        """
+        find = self._find
+        book_index = self._book_index
+        cover_index = self._cover_index
+        image_index = self._image_index
+        return {
+            book_id: {
+                "fb2": find(book_id, book_index),
+                "cover": find(book_id, cover_index),
+                "image": find(book_id, image_index),
+            }
+            for book_id in book_ids
+        }
+
+    @classmethod
+    def _parse_range(cls, name: str) -> Optional[Tuple[int, int]]:
+        """Extract the inclusive ``(start, end)`` ID range from an archive name.
+
+        Hand-parsed fast path: strip the known suffix, split on ``-`` and
+        validate the last two tokens with ``str.isdigit``.  This avoids a
+        regex-engine run per directory entry during the scan; the compiled
+        regexes remain as a slow-path fallback for unusual names.
+        """
+        if name.endswith(".7z"):
+            stem = name[:-3]
+        elif name.endswith(".zip"):
+            stem = name[:-4]
+        else:
+            return None
+        tokens = stem.split("-")
+        if (
+            len(tokens) >= 3
+            and tokens[-1].isdigit()
+            and tokens[-2].isdigit()
+            and tokens[-3].lower().endswith("fb2")
+        ):
+            return int(tokens[-2]), int(tokens[-1])
+        # slow path: fall back to the regexes for anything hand-parsing missed
+        regex = cls._BOOK_RE if name.endswith(".7z") else cls._COVER_IMG_RE
+        m = regex.search(name)
+        if m:
+            return int(m.group(1)), int(m.group(2))
+        return None
+
+    @staticmethod
+    def _walk(root: Path, suffix: str):
+        """Yield ``os.DirEntry`` objects under *root* whose name ends in *suffix*.
+
+        Manual ``os.scandir`` recursion; cheaper than ``Path.rglob`` because no
+        ``Path`` object is built per entry — callers materialize one only for
+        actual matches.
+        """
+        stack = [str(root)]
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        stack.append(entry.path)
+                    elif entry.name.endswith(suffix):
+                        yield entry
+
+    def _scan_tree(self, root: Path, suffix: str) -> List[ArchiveInfo]:
+        """Collect ArchiveInfo items for every matching archive under *root*."""
+        infos: List[ArchiveInfo] = []
+        if not root.exists():
+            return infos
+        for entry in self._walk(root, suffix):
+            rng = self._parse_range(entry.name)
+            if rng:
+                infos.append(ArchiveInfo(rng[0], rng[1], Path(entry.path)))
+        return infos
+
     def _scan_archives(self) -> None:
         """Populate internal lists with ArchiveInfo items."""
-        # books live both in dump_root itself and potentially sub-folders
-        for path in self.dump_root.rglob("*.7z"):
-            m = self._BOOK_RE.search(path.name)
-            if m:
-                start, end = map(int, m.groups())
-                self._book_archives.append(ArchiveInfo(start, end, path))
-
-        covers_dir = self.dump_root / "covers"
-        images_dir = self.dump_root / "images"
-        for path in covers_dir.rglob("*.zip") if covers_dir.exists() else []:
-            m = self._COVER_IMG_RE.search(path.name)
-            if m:
-                start, end = map(int, m.groups())
-                self._cover_archives.append(ArchiveInfo(start, end, path))
-        for path in images_dir.rglob("*.zip") if images_dir.exists() else []:
-            m = self._COVER_IMG_RE.search(path.name)
-            if m:
-                start, end = map(int, m.groups())
-                self._image_archives.append(ArchiveInfo(start, end, path))
+        # the three trees are independent and the walks mostly block on
+        # readdir/stat, so scan them concurrently
+        # (books live both in dump_root itself and potentially sub-folders)
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            fut_books = ex.submit(self._scan_tree, self.dump_root, ".7z")
+            fut_covers = ex.submit(self._scan_tree, self.dump_root / "covers", ".zip")
+            fut_images = ex.submit(self._scan_tree, self.dump_root / "images", ".zip")
+        self._book_archives = fut_books.result()
+        self._cover_archives = fut_covers.result()
+        self._image_archives = fut_images.result()
 
         # sort lists for bisection search
         self._book_archives.sort(key=lambda a: a.start)
         self._cover_archives.sort(key=lambda a: a.start)
         self._image_archives.sort(key=lambda a: a.start)
 
+        # SoA mirrors of the sorted lists: parallel start/end/path sequences
+        # built once so lookups never rebuild a key list per call
+        self._book_index = self._build_index(self._book_archives)
+        self._cover_index = self._build_index(self._cover_archives)
+        self._image_index = self._build_index(self._image_archives)
+
     @staticmethod
-    def _find(book_id: int, archives: List[ArchiveInfo]) -> Optional[Path]:
-        """Binary-search *archives* list to find archive containing *book_id*."""
-        if not archives:
-            return None
-        # build list of starts for bisect
+    def _build_index(
+        archives: List[ArchiveInfo],
+    ) -> Tuple[List[int], List[int], List[Path], List[int]]:
+        """Return parallel ``(starts, ends, paths, last_hit)`` for *archives*.
+
+        ``last_hit`` is a one-slot mutable cache of the index returned by the
+        previous lookup (see :meth:`_find`).
+        """
         starts = [arc.start for arc in archives]
+        ends = [arc.end for arc in archives]
+        paths = [arc.path for arc in archives]
+        return starts, ends, paths, [0]
+
+    @staticmethod
+    def _find(
+        book_id: int, index: Tuple[List[int], List[int], List[Path], List[int]]
+    ) -> Optional[Path]:
+        """Binary-search the SoA *index* to find archive containing *book_id*.
+
+        INPX rows usually arrive in LIBID order, so consecutive lookups tend
+        to land in the same archive; the one-slot ``last_hit`` cache turns
+        that common case into two comparisons instead of a bisection.
+        """
+        starts, ends, paths, last_hit = index
+        if not starts:
+            return None
+        hint = last_hit[0]
+        if starts[hint] <= book_id <= ends[hint]:
+            return paths[hint]
         idx = bisect.bisect_right(starts, book_id) - 1
-        if idx < 0:
+        if idx < 0 or ends[idx] < book_id:
             return None
-        candidate = archives[idx]
-        return candidate.path if candidate.contains(book_id) else None
+        last_hit[0] = idx
+        return paths[idx]
@@ -10,11 +10,15 @@ The result is suitable for immediate `send_file` / `send_bytes` in Flask.
 from __future__ import annotations
 
 import base64
+import functools
 import io
-import re
+import threading
 import xml.etree.ElementTree as ET
+import zipfile
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Tuple
+from xml.sax.saxutils import quoteattr
 
 from .archive_extract import open_member
 from .models import Book
@@ -27,24 +31,95 @@ NSMAP = {
 for prefix, uri in NSMAP.items():
     ET.register_namespace(prefix if prefix != "fb" else "", uri)
 
+# pre-built Clark-notation tags/paths so assemble_fb2 does not re-concatenate
+# namespace strings per call
+_FB = "{http://www.gribuser.ru/xml/fictionbook/2.0}"
+_XL = "{http://www.w3.org/1999/xlink}"
+_COVER_PATH = f".//{_FB}coverpage/{_XL}image"
+_IMG_PATH = f".//{_FB}image"
+_TITLE_INFO_PATH = f".//{_FB}title-info"
+_COVERPAGE_TAG = f"{_FB}coverpage"
+_IMAGE_TAG = f"{_FB}image"
+_HREF_ATTR = f"{_XL}href"
 
-def _build_binary_element(fname: str, data: bytes) -> ET.Element:
-    elem = ET.Element("binary", attrib={"id": fname, "content-type": _mime_from_name(fname)})
-    elem.text = base64.b64encode(data).decode()
-    return elem
 
+def _write_binary(out: io.BytesIO, fname: str, data: bytes) -> None:
+    """Append a ``<binary>`` element for *data* directly to *out*.
 
+    base64-encodes straight into the output buffer; going through an
+    ElementTree text node would hold an extra str copy of every image and
+    re-serialize it again with the rest of the tree.
+    """
+    out.write(
+        b"<binary id=%s content-type=%s>"
+        % (quoteattr(fname).encode(), quoteattr(_mime_from_name(fname)).encode())
+    )
+    out.write(base64.b64encode(data))
+    out.write(b"</binary>")
+
+
+# LRU cache of open zip handles: cover/image archives are shared by whole
+# LIBID ranges, so consecutive requests keep hitting the same files and we
+# can skip re-parsing the central directory.  Keyed on (path, mtime) like
+# the web-layer index caches, so a replaced archive gets a fresh handle.
+_ZIP_CACHE_SIZE = 32
+_zip_cache: "OrderedDict[tuple[str, float], zipfile.ZipFile]" = OrderedDict()
+_zip_cache_lock = threading.Lock()
+
+
+def _zip_handle(path: str) -> zipfile.ZipFile:
+    key = (path, Path(path).stat().st_mtime)
+    with _zip_cache_lock:
+        zf = _zip_cache.get(key)
+        if zf is not None:
+            _zip_cache.move_to_end(key)
+            return zf
+        zf = zipfile.ZipFile(path)
+        _zip_cache[key] = zf
+        if len(_zip_cache) > _ZIP_CACHE_SIZE:
+            # drop the reference only: a concurrent download may still be
+            # reading from the evicted handle (zipfile serializes shared
+            # reads internally, but closing under a reader is not safe) —
+            # refcounting closes it once the last user lets go
+            _zip_cache.popitem(last=False)
+    return zf
+
+
+def _zip_book_index(zf: zipfile.ZipFile) -> dict:
+    """Return ``{book_id_str: {basename: fullname}}`` for *zf*, built once.
+
+    Image archives hold one directory per book; partitioning the namelist on
+    every call is O(archive size), so the index is computed on first use and
+    stored on the handle (its lifetime matches the cache entry's).
+    """
+    idx = getattr(zf, "_flibook_index", None)
+    if idx is None:
+        idx = {}
+        for n in zf.namelist():
+            if n.endswith("/"):
+                continue
+            parts = n.split("/")
+            if len(parts) >= 2:
+                idx.setdefault(parts[0], {})[parts[-1]] = n
+        zf._flibook_index = idx
+    return idx
+
+
+_MIME = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+}
+
+
+@functools.lru_cache(maxsize=64)
 def _mime_from_name(fname: str) -> str:
-    ext = Path(fname).suffix.lower()
-    if ext:
-        return {
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".png": "image/png",
-            ".gif": "image/gif",
-        }.get(ext, "application/octet-stream")
-    # assume JPEG for extensionless names
-    return "image/jpeg"
+    dot = fname.rfind(".")
+    if dot < 0:
+        # assume JPEG for extensionless names
+        return "image/jpeg"
+    return _MIME.get(fname[dot + 1 :].lower(), "application/octet-stream")
 
 
 # ---------------------------------------------------------------------------
@@ -66,33 +141,33 @@ def assemble_fb2(book: Book) -> bytes:
     binaries: List[Tuple[str, bytes]] = []
 
     # determine existing coverpage reference, if any
-    cover_elem = root.find('.//{http://www.gribuser.ru/xml/fictionbook/2.0}coverpage/{http://www.w3.org/1999/xlink}image')
+    cover_elem = root.find(_COVER_PATH)
     cover_id = None
     if cover_elem is not None:
-        href = cover_elem.attrib.get('{http://www.w3.org/1999/xlink}href', '')
+        href = cover_elem.attrib.get(_HREF_ATTR, '')
         if href.startswith('#'):
             cover_id = href[1:]
     if cover_id is None:
         cover_id = 'cover.jpg'
     if book.cover_archive:
-        import zipfile, py7zr
+        import py7zr
         cov_path = Path(book.cover_archive)
         cov_data: bytes | None = None
         if cov_path.suffix.lower() == ".zip":
-            with zipfile.ZipFile(cov_path) as zf:
-                # candidate names: id or id.jpg else first file
-                cand = None
-                for n in zf.namelist():
-                    base = Path(n).name
-                    if base in {str(book.id), f"{book.id}.jpg"} and not n.endswith('/'):
-                        cand = n
-                        break
-                if cand is None:
-                    cand = next((n for n in zf.namelist() if not n.endswith('/')), None)
-                if cand:
-                    with zf.open(cand) as fp:
-                        cov_data = fp.read()
-                        cov_name = cand
+            zf = _zip_handle(str(cov_path))
+            # candidate names: id or id.jpg else first file
+            cand = None
+            for n in zf.namelist():
+                base = Path(n).name
+                if base in {str(book.id), f"{book.id}.jpg"} and not n.endswith('/'):
+                    cand = n
+                    break
+            if cand is None:
+                cand = next((n for n in zf.namelist() if not n.endswith('/')), None)
+            if cand:
+                with zf.open(cand) as fp:
+                    cov_data = fp.read()
+                    cov_name = cand
         elif cov_path.suffix.lower() == ".7z":
             with py7zr.SevenZipFile(cov_path, mode="r") as zf:
                 names = [n for n in zf.getnames() if not n.endswith('/')]
@@ -111,51 +186,41 @@ def assemble_fb2(book: Book) -> bytes:
             binaries.append((cover_id, cov_data))
 
     # ensure <coverpage> references the cover_id
-    ns_fb = "{http://www.gribuser.ru/xml/fictionbook/2.0}"
-    ns_l = "{http://www.w3.org/1999/xlink}"
     if cover_id:
         if cover_elem is not None:
-            cover_elem.attrib[f"{ns_l}href"] = f"#{cover_id}"
+            cover_elem.attrib[_HREF_ATTR] = f"#{cover_id}"
         else:
-            title_info = root.find(f".//{ns_fb}title-info")
+            title_info = root.find(_TITLE_INFO_PATH)
             if title_info is not None:
-                coverpage = ET.SubElement(title_info, f"{ns_fb}coverpage")
-                img = ET.SubElement(coverpage, f"{ns_fb}image")
-                img.attrib[f"{ns_l}href"] = f"#{cover_id}"
+                coverpage = ET.SubElement(title_info, _COVERPAGE_TAG)
+                img = ET.SubElement(coverpage, _IMAGE_TAG)
+                img.attrib[_HREF_ATTR] = f"#{cover_id}"
 
     # embed images referenced in the FB2 body
     if book.images_archive:
         # collect all xlink hrefs in <image> elements
         href_ids: set[str] = set()
-        for img in root.findall('.//{http://www.gribuser.ru/xml/fictionbook/2.0}image'):
-            href = img.attrib.get('{http://www.w3.org/1999/xlink}href')
+        for img in root.findall(_IMG_PATH):
+            href = img.attrib.get(_HREF_ATTR)
             if href and href.startswith('#'):
                 href_ids.add(href[1:])
 
         if href_ids:
             arch_path = Path(book.images_archive)
             if arch_path.suffix.lower() == '.zip':
-                import zipfile
-
-                with zipfile.ZipFile(arch_path) as zf:
-                    namelist = {}
-                    for n in zf.namelist():
-                        if n.endswith('/'):
-                            continue
-                        parts = Path(n).parts
-                        if len(parts) >= 2 and parts[0] == str(book.id):
-                            namelist[parts[-1]] = n
-                    for img_id in href_ids:
-                        if any(img_id == b[0] for b in binaries):
-                            continue  # already embedded (e.g., cover)
-                        cand = None
-                        for variant in (img_id, f"{img_id}.jpg", f"{img_id}.png", f"{img_id}.gif"):
-                            if variant in namelist:
-                                cand = namelist[variant]
-                                break
-                        if cand:
-                            with zf.open(cand) as fp:
-                                binaries.append((img_id, fp.read()))
+                zf = _zip_handle(str(arch_path))
+                namelist = _zip_book_index(zf).get(str(book.id), {})
+                for img_id in href_ids:
+                    if any(img_id == b[0] for b in binaries):
+                        continue  # already embedded (e.g., cover)
+                    cand = None
+                    for variant in (img_id, f"{img_id}.jpg", f"{img_id}.png", f"{img_id}.gif"):
+                        if variant in namelist:
+                            cand = namelist[variant]
+                            break
+                    if cand:
+                        with zf.open(cand) as fp:
+                            binaries.append((img_id, fp.read()))
             else:
                 import py7zr
 
@@ -179,10 +244,25 @@ def assemble_fb2(book: Book) -> bytes:
                             data = zf.read([cand])[cand]
                             binaries.append((img_id, data))
 
-    # append <binary> elements at the end of FB2 root
-    for fname, data in binaries:
-        root.append(_build_binary_element(fname, data))
+    # serialize the document once without binaries, then splice <binary>
+    # elements in front of the closing root tag so the (potentially multi-MB)
+    # base64 payloads are never attached to the tree and re-serialized
+    doc = ET.tostring(root, encoding="utf-8", xml_declaration=True)
+    if not binaries:
+        return doc
 
-    buf = io.BytesIO()
-    tree.write(buf, encoding="utf-8", xml_declaration=True)
-    return buf.getvalue()
+    out = io.BytesIO()
+    close = doc.rfind(b"</")
+    if close != -1:
+        out.write(doc[:close])
+        closing = doc[close:]
+    else:
+        # empty root serialized as a self-closing tag - reopen it
+        slash = doc.rindex(b"/>")
+        out.write(doc[:slash])
+        out.write(b">")
+        closing = b"</%s>" % root.tag.rpartition("}")[2].encode()
+    for fname, data in binaries:
+        _write_binary(out, fname, data)
+    out.write(closing)
+    return out.getvalue()
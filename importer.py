@@ -2,18 +2,21 @@
 
 from __future__ import annotations
 
+from datetime import date as _date
 from pathlib import Path
-from typing import Iterable
+from typing import Optional, Tuple
 
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import insert, select
 
 from .archive_resolver import ArchiveResolver
 
-from .models import Author, Book, Series, get_session, init_db
+from .models import Author, Book, BookAuthor, Series, get_session, init_db
 from .parser import InpxParser
 
 __all__ = ["import_inpx"]
 
+_AuthorKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
 
 def import_inpx(
     inpx: Path,
@@ -30,26 +33,35 @@ def import_inpx(
     parser = InpxParser()
     resolver = ArchiveResolver(dump_root) if dump_root else None
 
-    # performance optimisation caches
-    authors_cache: dict[tuple[str | None, str | None, str | None], Author] = {}
-    series_cache: dict[str, Series] = {}
+    # performance optimisation caches (lowered key -> primary key)
+    authors_cache: dict[_AuthorKey, int] = {}
+    series_cache: dict[str, int] = {}
 
     count = 0
     buffer: list[dict] = []
     import sys, time
     start_ts = time.time()
-    last_report = 0.0
+    # report every 5% via a byte threshold: one comparison per callback
+    # instead of recomputing the percentage, and nothing at all when stderr
+    # is not a terminal (CI, log-to-file)
+    _progress_cb = None
+    if sys.stderr.isatty():
+        state = {"fname": None, "step": 1, "next": 1}
 
-    def _progress_cb(fname: str, done: int, total: int):
-        nonlocal last_report
-        pct = done / total * 100 if total else 0
-        if pct - last_report >= 5 or done == total:  # report every 5%
+        def _progress_cb(fname: str, done: int, total: int):
+            if fname != state["fname"]:
+                state["fname"] = fname
+                state["step"] = max(total // 20, 1)
+                state["next"] = state["step"]
+            if done < state["next"] and done != total:
+                return
+            pct = done / total * 100 if total else 0
             elapsed = time.time() - start_ts
             sys.stderr.write(
                 f"\r[{fname}] {pct:5.1f}%  | {done//1024//1024}MB/{total//1024//1024}MB  | {elapsed:,.0f}s elapsed"
             )
             sys.stderr.flush()
-            last_report = pct
+            state["next"] += state["step"]
 
     for row in parser.parse(inpx, progress_cb=_progress_cb):
         buffer.append(row)
@@ -66,94 +78,216 @@ def import_inpx(
 
 
 def _flush(buffer: list[dict], session, resolver, authors_cache, series_cache):
+    # batch-resolve archives for the whole chunk up front; memoize the
+    # Path -> posix conversion since consecutive rows share archives
+    resolved_map: dict = {}
+    posix_cache: dict = {}
+    if resolver:
+        resolved_map = resolver.resolve_many(
+            row["libid"] for row in buffer if row.get("libid") is not None
+        )
+
+    def _posix(p):
+        if p is None:
+            return None
+        s = posix_cache.get(p)
+        if s is None:
+            s = posix_cache[p] = p.as_posix()
+        return s
+
+    # upsert authors/series for the whole chunk in a handful of statements;
+    # the returned memos map raw field strings to their lowered cache keys so
+    # the row loop below never re-splits or re-lowercases a repeated string
+    author_keys = _ensure_authors(session, buffer, authors_cache)
+    series_keys = _ensure_series(session, buffer, series_cache)
+
+    # one IN query for the whole chunk replaces a session.get() probe per row
+    chunk_ids = [row["libid"] for row in buffer if row.get("libid") is not None]
+    existing: set[int] = set(
+        session.execute(select(Book.id).where(Book.id.in_(chunk_ids))).scalars()
+    )
+
+    book_rows: list[dict] = []
+    link_rows: list[dict] = []
+    # alias hot bound methods so the row loop runs on local-variable loads
+    book_append = book_rows.append
+    link_append = link_rows.append
+    authors_get = authors_cache.get
+    series_get = series_cache.get
     for row in buffer:
-        # skip records lacking numeric book ID
-        if row.get("libid") is None:
+        # skip records lacking numeric book ID (or repeated in this chunk)
+        libid = row.get("libid")
+        if libid is None or libid in existing:
             continue
+        existing.add(libid)
 
-        authors = _ensure_authors(session, row["authors"], authors_cache)
-        series_obj = _ensure_series(session, row.get("series"), series_cache)
-        # convert ISO date string to date object if present
-        date_obj = None
-        if row.get("date"):
-            from datetime import date as _date
-            try:
-                date_obj = _date.fromisoformat(row["date"])
-            except ValueError:
-                pass  # leave None if bad format
+        # convert ISO date string to date object if present; validate the
+        # shape up front so malformed dumps do not pay for an exception per row
+        date_obj = _parse_date(row.get("date"))
         # resolve archives if possible
         fb2_path = cover_path = img_path = None
         if resolver:
-            resolved = resolver.resolve(row["libid"])
-            fb2_path = resolved["fb2"].as_posix() if resolved["fb2"] else None
-            cover_path = resolved["cover"].as_posix() if resolved["cover"] else None
-            img_path = resolved["image"].as_posix() if resolved["image"] else None
+            resolved = resolved_map[libid]
+            fb2_path = _posix(resolved["fb2"])
+            cover_path = _posix(resolved["cover"])
+            img_path = _posix(resolved["image"])
 
-        # skip if already in DB
-        if session.get(Book, row["libid"]):
-            continue
+        series_id = None
+        if row.get("series"):
+            series_id = series_get(series_keys[row["series"]])
 
-        book = Book(
-            id=row["libid"],
-            title=row["title"],
-            file_stub=row["file"],
-            file_ext=row["ext"],
-            folder=row.get("folder"),
-            size=row["size"],
-            date=date_obj,
-            deleted=row.get("deleted", False),
-            fb2_archive=fb2_path,
-            cover_archive=cover_path,
-            images_archive=img_path,
-            series=series_obj,
-            # archive paths will be added later by additional logic
+        book_append(
+            {
+                "id": libid,
+                "title": row["title"],
+                "file_stub": row["file"],
+                "file_ext": row["ext"],
+                "folder": row.get("folder"),
+                "size": row["size"],
+                "date": date_obj,
+                "deleted": row.get("deleted", False),
+                "fb2_archive": fb2_path,
+                "cover_archive": cover_path,
+                "images_archive": img_path,
+                "series_id": series_id,
+            }
         )
-        book.authors = authors
-        session.add(book)
+        author_ids: list[int] = []
+        for full in row["authors"]:
+            author_id = authors_get(author_keys[full])
+            if author_id is not None and author_id not in author_ids:
+                author_ids.append(author_id)
+                link_append({"book_id": libid, "author_id": author_id})
+
+    # Core-level executemany: one statement per table for the whole chunk
+    # instead of an ORM object + INSERT round trip per row
+    if book_rows:
+        session.execute(insert(Book), book_rows)
+    if link_rows:
+        session.execute(insert(BookAuthor), link_rows)
     session.flush()
 
 
-def _ensure_authors(session, authors_list: Iterable[str], cache: dict):
-    objs: list[Author] = []
-    for full in authors_list:
-        parts = [p.strip() for p in full.split(",")]
-        last = parts[0] if len(parts) > 0 and parts[0] else None
-        first = parts[1] if len(parts) > 1 and parts[1] else None
-        middle = parts[2] if len(parts) > 2 and parts[2] else None
-        # Ensure last_name is never NULL – shift first name if necessary
-        if last is None:
-            last, first = first, None
-        key = (
-            (last or "").lower() if last else None,
-            (first or "").lower() if first else None,
-            (middle or "").lower() if middle else None,
+def _parse_date(s: str | None) -> Optional[_date]:
+    """Parse ``YYYY-MM-DD`` or return None, without raising on bad input.
+
+    Malformed dates are common in dumps and the try/except around
+    ``date.fromisoformat`` made every bad row pay for exception unwinding;
+    the shape check rejects them with a few string comparisons instead.
+    """
+    if not s or len(s) != 10 or s[4] != "-" or s[7] != "-":
+        return None
+    y, mo, d = s[:4], s[5:7], s[8:]
+    if not (y.isdigit() and mo.isdigit() and d.isdigit()):
+        return None
+    try:
+        return _date(int(y), int(mo), int(d))
+    except ValueError:
+        return None  # digits but out of range, e.g. month 13
+
+
+def _split_author(full: str) -> _AuthorKey:
+    """Split an AUTHOR entry into ``(last, first, middle)`` name parts."""
+    parts = [p.strip() for p in full.split(",")]
+    last = parts[0] if len(parts) > 0 and parts[0] else None
+    first = parts[1] if len(parts) > 1 and parts[1] else None
+    middle = parts[2] if len(parts) > 2 and parts[2] else None
+    # Ensure last_name is never NULL – shift first name if necessary
+    if last is None:
+        last, first = first, None
+    return last, first, middle
+
+
+def _author_key(names: _AuthorKey) -> _AuthorKey:
+    last, first, middle = names
+    return (
+        last.lower() if last else None,
+        first.lower() if first else None,
+        middle.lower() if middle else None,
+    )
+
+
+def _ensure_authors(
+    session, buffer: list[dict], cache: dict[_AuthorKey, int]
+) -> dict[str, _AuthorKey]:
+    """Make sure every author in *buffer* has a row; fill *cache* with IDs.
+
+    Collects the chunk's unseen authors, matches them against the DB with one
+    ``SELECT ... WHERE last_name IN (...)``, bulk-inserts the remainder and
+    re-selects their IDs — replacing the query + flush per new author.
+
+    Returns ``{raw AUTHOR entry: lowered cache key}`` so callers can reuse
+    the split/lower work done here.
+    """
+    keys: dict[str, _AuthorKey] = {}
+    pending: dict[_AuthorKey, _AuthorKey] = {}
+    for row in buffer:
+        for full in row["authors"]:
+            if full in keys:
+                continue
+            names = _split_author(full)
+            key = keys[full] = _author_key(names)
+            if key not in cache and key not in pending:
+                pending[key] = names
+
+    def _match_existing() -> None:
+        last_names = {names[0] for names in pending.values()}
+        found = session.execute(
+            select(
+                Author.id, Author.last_name, Author.first_name, Author.middle_name
+            ).where(Author.last_name.in_(last_names))
+        ).all()
+        by_names = {(r.last_name, r.first_name, r.middle_name): r.id for r in found}
+        for key, names in list(pending.items()):
+            author_id = by_names.get(names)
+            if author_id is not None:
+                cache[key] = author_id
+                del pending[key]
+
+    if pending:
+        _match_existing()
+    if pending:
+        session.execute(
+            insert(Author),
+            [
+                {"last_name": n[0], "first_name": n[1], "middle_name": n[2]}
+                for n in pending.values()
+            ],
         )
-        obj = cache.get(key)
-        if obj is None:
-            obj = (
-                session.query(Author)
-                .filter_by(last_name=last, first_name=first, middle_name=middle)
-                .one_or_none()
-            )
-            if obj is None:
-                obj = Author(last_name=last, first_name=first, middle_name=middle)
-                session.add(obj)
-                session.flush([obj])
-            cache[key] = obj
-        objs.append(obj)
-    return objs
+        _match_existing()
+    return keys
 
 
-def _ensure_series(session, name: str | None, cache: dict[str, Series]):
-    if not name:
-        return None
-    key = name.strip().lower()
-    obj = cache.get(key)
-    if obj is None:
-        obj = session.query(Series).filter_by(name=name).one_or_none()
-        if obj is None:
-            obj = Series(name=name)
-            session.add(obj)
-            session.flush([obj])
-        cache[key] = obj
-    return obj
+def _ensure_series(session, buffer: list[dict], cache: dict[str, int]) -> dict[str, str]:
+    """Make sure every series in *buffer* has a row; fill *cache* with IDs.
+
+    Returns ``{raw series name: lowered cache key}`` (same contract as
+    :func:`_ensure_authors`).
+    """
+    keys: dict[str, str] = {}
+    pending: dict[str, str] = {}
+    for row in buffer:
+        name = row.get("series")
+        if not name or name in keys:
+            continue
+        key = keys[name] = name.strip().lower()
+        if key not in cache and key not in pending:
+            pending[key] = name
+
+    def _match_existing() -> None:
+        found = session.execute(
+            select(Series.id, Series.name).where(Series.name.in_(list(pending.values())))
+        ).all()
+        by_name = {r.name: r.id for r in found}
+        for key, name in list(pending.items()):
+            series_id = by_name.get(name)
+            if series_id is not None:
+                cache[key] = series_id
+                del pending[key]
+
+    if pending:
+        _match_existing()
+    if pending:
+        session.execute(insert(Series), [{"name": n} for n in pending.values()])
+        _match_existing()
+    return keys
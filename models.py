@@ -70,21 +70,73 @@ class BookAuthor(Base):
 
 _engine = None
 _Session = None
+_fts_enabled = False
+
+# full-text index over book titles and author names, kept in sync by
+# triggers so both ORM and Core-level inserts are covered
+_AUTHORS_CONCAT = (
+    "(SELECT group_concat(a.last_name || ' ' || coalesce(a.first_name, '') || ' ' "
+    "|| coalesce(a.middle_name, ''), ' ') "
+    "FROM authors a JOIN book_authors ba ON ba.author_id = a.id "
+    "WHERE ba.book_id = {ref})"
+)
+
+_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title, authors, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, authors) VALUES (new.id, new.title, ''); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    "DELETE FROM books_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title ON books BEGIN "
+    "UPDATE books_fts SET title = new.title WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ba_ai AFTER INSERT ON book_authors BEGIN "
+    "UPDATE books_fts SET authors = coalesce(" + _AUTHORS_CONCAT.format(ref="new.book_id") + ", '') "
+    "WHERE rowid = new.book_id; END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ba_ad AFTER DELETE ON book_authors BEGIN "
+    "UPDATE books_fts SET authors = coalesce(" + _AUTHORS_CONCAT.format(ref="old.book_id") + ", '') "
+    "WHERE rowid = old.book_id; END",
+    # backfill books imported before the index existed
+    "INSERT INTO books_fts(rowid, title, authors) "
+    "SELECT b.id, b.title, coalesce(" + _AUTHORS_CONCAT.format(ref="b.id") + ", '') "
+    "FROM books b WHERE b.id NOT IN (SELECT rowid FROM books_fts)",
+]
+
+
+def _init_fts(engine) -> bool:
+    """Create the FTS5 index and sync triggers; returns False if unavailable."""
+    if engine.dialect.name != "sqlite":
+        return False
+    from sqlalchemy.exc import OperationalError
+
+    try:
+        with engine.begin() as conn:
+            for stmt in _FTS_DDL:
+                conn.exec_driver_sql(stmt)
+    except OperationalError:  # SQLite built without FTS5
+        return False
+    return True
+
+
+def fts_enabled() -> bool:
+    """True when the books_fts full-text index is available for searching."""
+    return _fts_enabled
 
 
 def init_db(url: str = "sqlite:///flibook.db") -> None:
     """Create engine, create tables if not exist, globally store session factory."""
-    global _engine, _Session
+    global _engine, _Session, _fts_enabled
     from sqlalchemy import event
 
     _engine = create_engine(url, future=True)
 
     # register Unicode-aware lower() that SQLite will use in SQL
     @event.listens_for(_engine, "connect")
-    def register_unicode_lower(dbapi_conn, _): 
+    def register_unicode_lower(dbapi_conn, _):
         dbapi_conn.create_function("lower", 1, lambda s: s.lower() if isinstance(s, str) else s)
 
     Base.metadata.create_all(_engine)
+    _fts_enabled = _init_fts(_engine)
     _Session = sessionmaker(_engine, expire_on_commit=False, future=True)
 
 
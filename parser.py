@@ -2,8 +2,9 @@
 
 The .inpx file is a ZIP archive with extension changed and, in
 some dumps, without the 22-byte *End of Central Directory* (EOCD) record.
-`zipfile` fails on such files.  We work around this by appending a minimal
-EOCD stub in memory and then opening the resulting stream with `zipfile`.
+`zipfile` fails on such files.  We work around this by walking the
+central-directory headers ourselves and serving the members through a
+minimal in-memory ZipFile-like frontend.
 
 Exposes a single high-level helper `InpxParser.parse()` which yields dicts
 representing each book row as parsed from the .inp files.
@@ -15,20 +16,126 @@ Example:
 from __future__ import annotations
 
 import io
+import os
+import struct
 import zipfile
+import zlib
 
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Iterable, List
 
 _DEFAULT_STRUCTURE = (
     "AUTHOR;GENRE;TITLE;SERIES;SERNO;FILE;SIZE;LIBID;DEL;EXT;DATE;LANG;KEYWORDS;FOLDER;"
 )
 
+# precompiled ZIP header layouts for the EOCD-less fallback: the 46-byte
+# central-directory fixed part and the 30-byte local-file-header fixed part,
+# each unpacked with a single C call instead of one int.from_bytes per field
+_CD_HDR = struct.Struct("<4s6H3I5H2I")
+_LF_HDR = struct.Struct("<4s5H3I2H")
+_U32 = struct.Struct("<I")
+
+_FIELD_SEP = "\x04"
+
+
+def _to_int(val: str | None):
+    try:
+        return int(val) if val not in (None, "") else None
+    except ValueError:
+        return None
+
+
+def _parse_member(data: bytes, schema: tuple, encoding: str, fallback: str) -> List[dict]:
+    """Parse one whole .inp payload into rows (process-pool worker)."""
+    parser = InpxParser(encoding, fallback)
+    rows: List[dict] = []
+    append = rows.append
+    parse_line = parser._parse_line
+    for line in parser._decode_block(data).split("\n"):
+        row = parse_line(line, schema)
+        if row:
+            append(row)
+    return rows
+
+
+class _MemberReader:
+    """Minimal read-only file over one deflated member.
+
+    Inflates on demand with ``zlib.decompressobj`` so only the requested
+    output (plus one 64 KB input chunk) is in memory at a time, interleaving
+    decompression with parsing instead of materializing a 100+ MB .inp
+    payload up front.
+    """
+
+    def __init__(self, comp: bytes):
+        self._comp = comp
+        self._pos = 0
+        self._z = zlib.decompressobj(-15)
+        self._buf = b""
+        self._eof = False
+
+    def read(self, size: int = -1) -> bytes:
+        if size is not None and size < 0:
+            size = None
+        while not self._eof and (size is None or len(self._buf) < size):
+            tail = self._z.unconsumed_tail
+            if not tail:
+                tail = self._comp[self._pos : self._pos + (1 << 16)]
+                self._pos += len(tail)
+            if tail:
+                self._buf += self._z.decompress(tail, size or 0)
+            else:
+                self._buf += self._z.flush()
+                self._eof = True
+        if size is None:
+            out, self._buf = self._buf, b""
+        else:
+            out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _PseudoZip:
+    """Minimal in-memory ZipFile-like frontend for the EOCD-less fallback.
+
+    *files* maps member name to ``(compressed bytes, method, uncompressed
+    size)``; members stay compressed until read.
+    """
+
+    def __init__(self, files: dict[str, tuple[bytes, int, int]]):
+        self._files = files
+
+    def namelist(self):
+        return list(self._files)
+
+    def open(self, name):
+        comp, method, _ = self._files[name]
+        return io.BytesIO(comp) if method == 0 else _MemberReader(comp)
+
+    def read(self, name):
+        comp, method, _ = self._files[name]
+        return comp if method == 0 else zlib.decompress(comp, -15)
+
+    def getinfo(self, name):
+        return SimpleNamespace(file_size=self._files[name][2])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
 
 class InpxParser:
     """Parse .inpx file and yield book metadata rows (dicts)."""
 
-    FIELD_SEPARATOR = "\x04"
+    FIELD_SEPARATOR = _FIELD_SEP
 
     def __init__(self, encoding: str = "utf-8", fallback_encoding: str = "cp1251") -> None:
         self.encoding = encoding
@@ -43,28 +150,61 @@ class InpxParser:
         path: Path | str,
         *,
         progress_cb: "Callable[[str,int,int],None] | None" = None,
+        workers: int | None = None,
     ) -> Iterable[dict]:
         """Yield dictionaries with book metadata for every record in .inp files.
 
         If *progress_cb* is provided, it will be called periodically with
         arguments *(file_name, processed_bytes, total_bytes)*.
+
+        *workers* controls how many processes parse .inp files in parallel
+        (default: CPU count).  Dumps with a single .inp file are parsed
+        sequentially with streaming either way.
         """
         from typing import Callable  # local import to avoid top-level overhead
 
         path = Path(path)
         with self._open_zip(path) as zf:
             structure = self._read_structure(zf)
-            for inp_name in (n for n in zf.namelist() if n.endswith(".inp")):
-                data = zf.read(inp_name)
-                total_len = len(data)
+            schema = self._compile_structure(structure)
+            inp_names = [n for n in zf.namelist() if n.endswith(".inp")]
+            if workers is None:
+                workers = os.cpu_count() or 1
+            if workers > 1 and len(inp_names) > 1:
+                yield from self._parse_parallel(
+                    zf, inp_names, schema, workers, progress_cb
+                )
+                return
+            for inp_name in inp_names:
+                total_len = zf.getinfo(inp_name).file_size
                 processed = 0
-                for line in data.splitlines(keepends=False):
-                    processed += len(line) + 1  # +1 for newline approx
-                    if progress_cb and processed % 500000 == 0:  # every ~0.5 MB
-                        progress_cb(inp_name, processed, total_len)
-                    row = self._parse_line(line, structure)
-                    if row:
-                        yield row
+                last_tick = 0
+                # stream in 64 KB blocks and decode each block of complete
+                # lines in one C call, instead of a try/except decode per line
+                with zf.open(inp_name) as fh:
+                    parse_line = self._parse_line
+                    buf = b""
+                    while True:
+                        chunk = fh.read(1 << 16)
+                        if not chunk:
+                            break
+                        processed += len(chunk)
+                        buf += chunk
+                        nl = buf.rfind(b"\n")
+                        if nl == -1:
+                            continue
+                        block, buf = buf[: nl + 1], buf[nl + 1 :]
+                        for line in self._decode_block(block).split("\n"):
+                            row = parse_line(line, schema)
+                            if row:
+                                yield row
+                        if progress_cb and processed - last_tick >= 500000:  # every ~0.5 MB
+                            progress_cb(inp_name, processed, total_len)
+                            last_tick = processed
+                    if buf:  # trailing line without a newline
+                        row = self._parse_line(self._decode_block(buf), schema)
+                        if row:
+                            yield row
                 if progress_cb:
                     progress_cb(inp_name, total_len, total_len)
 
@@ -72,6 +212,32 @@ class InpxParser:
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _parse_parallel(self, zf, inp_names, schema, workers, progress_cb):
+        """Parse independent .inp members on a process pool.
+
+        Members are dispatched in batches of *workers* so at most that many
+        raw .inp payloads are in flight at once; rows are yielded in member
+        order as each batch completes.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from itertools import repeat
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(inp_names))) as ex:
+            for i in range(0, len(inp_names), workers):
+                batch = inp_names[i : i + workers]
+                results = ex.map(
+                    _parse_member,
+                    (zf.read(name) for name in batch),
+                    repeat(schema),
+                    repeat(self.encoding),
+                    repeat(self.fallback_encoding),
+                )
+                for name, rows in zip(batch, results):
+                    if progress_cb:
+                        total = zf.getinfo(name).file_size
+                        progress_cb(name, total, total)
+                    yield from rows
+
     def _open_zip(self, path: Path) -> zipfile.ZipFile:
         """Open a .inpx file tolerant to missing EOCD.
 
@@ -89,162 +255,149 @@ class InpxParser:
         # ------------------------------------------------------------------
         # Fallback: minimal ZIP parser sufficient for .inpx (no EOCD needed)
         # ------------------------------------------------------------------
-        import struct, zlib, types, io
+        import mmap
 
-        data = Path(path).read_bytes()
+        # memory-map the archive instead of materializing it as one bytes
+        # object: header fields are read through zero-copy memoryview slices
+        # and only the compressed chunks we actually extract get copied
+        with open(path, "rb") as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # zero-length file; bytes has the same API
+                data = b""
+        mv = memoryview(data)
         cd_sig = b"PK\x01\x02"
         lf_sig = b"PK\x03\x04"
-
-        entries: dict[str, bytes] = {}
-        offset = 0
         dlen = len(data)
-        # scan entire file for central directory headers
-        while offset < dlen:
-            pos = data.find(cd_sig, offset)
-            if pos == -1:
-                break
-            # central dir fixed part length
-            if pos + 46 > dlen:
-                break
-            # headers 
-            comp_method = int.from_bytes(data[pos + 10 : pos + 12], "little")
-            name_len = int.from_bytes(data[pos + 28 : pos + 30], "little")
-            extra_len = int.from_bytes(data[pos + 30 : pos + 32], "little")
-            comment_len = int.from_bytes(data[pos + 32 : pos + 34], "little")
-            lfh_off = int.from_bytes(data[pos + 42 : pos + 46], "little")
+
+        # Locate the central directory start.  If an EOCD record survives it
+        # sits in the last 65557 bytes (22-byte record + max comment) and a
+        # single bytes.rfind over that window pinpoints the CD offset;
+        # otherwise one forward bytes.find locates the first header.  Both
+        # are single C-level (memchr) sweeps, unlike re-running find() for
+        # every entry over a multi-GB file.
+        cd_start = -1
+        eocd = data.rfind(b"PK\x05\x06", max(0, dlen - 65557))
+        if eocd != -1 and eocd + 20 <= dlen:
+            cd_off = _U32.unpack_from(mv, eocd + 16)[0]
+            if mv[cd_off : cd_off + 4] == cd_sig:
+                cd_start = cd_off
+        if cd_start == -1:
+            cd_start = data.find(cd_sig)
+
+        # name -> (compressed bytes, method, uncompressed size); members stay
+        # compressed until read so memory is bounded by the archive size, not
+        # the (much larger) inflated .inp payloads
+        entries: dict[str, tuple[bytes, int, int]] = {}
+        pos = cd_start
+        # walk headers back-to-back: each one tells us where the next starts
+        while pos != -1 and pos + 46 <= dlen:
+            (sig, _, _, _, comp_method, _, _, _, comp_size, uncomp_size,
+             name_len, extra_len, comment_len, _, _, _, lfh_off) = _CD_HDR.unpack_from(mv, pos)
+            if sig != cd_sig:
+                # corrupt/non-contiguous directory - resync with one find()
+                pos = data.find(cd_sig, pos + 1)
+                continue
             name_start = pos + 46
             name_end = name_start + name_len
-            fname = data[name_start:name_end].decode(errors="replace")
+            fname = bytes(mv[name_start:name_end]).decode(errors="replace")
+            pos = name_end + extra_len + comment_len
 
             # extract .inp and structure.info
             if fname.endswith(".inp") or fname == "structure.info":
                 # parse local file header to locate data start
                 lfh_pos = lfh_off
-                if lfh_pos + 30 > dlen or data[lfh_pos : lfh_pos + 4] != lf_sig:
-                    offset = pos + 4
+                if lfh_pos + 30 > dlen:
                     continue
-                # local header fields
-                comp_size = int.from_bytes(data[lfh_pos + 18 : lfh_pos + 22], "little")
-                uncomp_size = int.from_bytes(data[lfh_pos + 22 : lfh_pos + 26], "little")
-                lf_name_len = int.from_bytes(data[lfh_pos + 26 : lfh_pos + 28], "little")
-                lf_extra_len = int.from_bytes(data[lfh_pos + 28 : lfh_pos + 30], "little")
-                data_start = lfh_pos + 30 + lf_name_len + lf_extra_len
-                comp_data = data[data_start : data_start + comp_size]
-                if comp_method == 0:  # stored
-                    file_bytes = comp_data[:uncomp_size]
-                elif comp_method == 8:  # deflate
-                    file_bytes = zlib.decompress(comp_data, -15)
-                else:
-                    offset = pos + 4
+                (lsig, _, _, _, _, _, _, _, _,
+                 lf_name_len, lf_extra_len) = _LF_HDR.unpack_from(mv, lfh_pos)
+                if lsig != lf_sig:
                     continue
-                entries[fname] = file_bytes
-            offset = pos + 46  # continue searching
-
-        # build a minimal in-memory ZipFile-like frontend
-        class _PseudoZip:
-            def __init__(self, files: dict[str, bytes]):
-                self._files = files
-            def namelist(self):
-                return list(self._files)
-            def open(self, name):
-                return io.BytesIO(self._files[name])
-            def read(self, name):
-                return self._files[name]
-            def __enter__(self):
-                return self
-            def __exit__(self, exc_type, exc, tb):
-                return False
-        return _PseudoZip(entries)
+                if comp_method not in (0, 8):  # stored / deflate only
+                    continue
+                data_start = lfh_pos + 30 + lf_name_len + lf_extra_len
+                entries[fname] = (
+                    bytes(mv[data_start : data_start + comp_size]),
+                    comp_method,
+                    uncomp_size,
+                )
 
-        # Fallback: build a valid EOCD record so that ``zipfile`` can parse the
-        # central directory.  The *End of Central Directory* structure is::
-        #     struct EOCD {
-        #         uint32 signature = 0x06054b50;
-        #         uint16 this_disk;
-        #         uint16 cd_start_disk;
-        #         uint16 records_on_this_disk;
-        #         uint16 total_records;
-        #         uint32 cd_size;
-        #         uint32 cd_offset;
-        #         uint16 comment_len;
-        #     }
-        # We locate the first occurrence of the central-directory header
-        # signature (0x02014b50 = ``PK\x01\x02``) to find the
-        # directory offset, count the number of headers and compute the
-        # directory size.  A minimally-valid EOCD is then added so that the
-        # standard :pymod:`zipfile` can work unmodified.
-        import struct
-
-        data = Path(path).read_bytes()
-
-        # If EOCD already present, re-raise original exception instead of
-        # corrupting data further - something else went wrong.
-        if data[-22:].startswith(b"PK\x05\x06"):
-            raise zipfile.BadZipFile("ZIP appears to contain EOCD yet could not be opened")
+        # extracted entries are independent copies - unmap the file
+        mv.release()
+        if isinstance(data, mmap.mmap):
+            data.close()
 
-        cd_sig = b"PK\x01\x02"
-        # Find first central-directory header.
-        first_cd = data.find(cd_sig)
-        if first_cd == -1:
-            raise zipfile.BadZipFile("Central directory not found in INPX - cannot recover")
-
-        # count of central-directory records
-        total_records = 0
-        ptr = first_cd
-        dlen = len(data)
-        while ptr + 46 <= dlen and data[ptr : ptr + 4] == cd_sig:
-            # Central dir file header fixed part = 46 bytes
-            # struct format <4s4B4HL2L5H (see spec) - we only need three 2-byte
-            # length fields at the tail.
-            name_len = int.from_bytes(data[ptr + 28 : ptr + 30], "little")
-            extra_len = int.from_bytes(data[ptr + 30 : ptr + 32], "little")
-            comment_len = int.from_bytes(data[ptr + 32 : ptr + 34], "little")
-            header_size = 46 + name_len + extra_len + comment_len
-            ptr += header_size
-            total_records += 1
-        # ``ptr`` now points to first byte after last header - start of EOCD
-        cd_size = ptr - first_cd
-        # Craft EOCD
-        eocd = struct.pack(
-            "<4s4H2LH",
-            b"PK\x05\x06",  # signature
-            0,                # this_disk
-            0,                # cd_start_disk
-            min(total_records, 0xFFFF),  # records_on_this_disk
-            min(total_records, 0xFFFF),  # total_records
-            cd_size & 0xFFFFFFFF,        # cd_size
-            first_cd & 0xFFFFFFFF,       # cd_offset
-            0,                # comment_len
-        )
-        data += eocd
-        return zipfile.ZipFile(io.BytesIO(data))
+        return _PseudoZip(entries)
 
     # ------------------------------------------------------------------
     # Line parsing helper extracted from old _parse_inp
     # ------------------------------------------------------------------
-    def _parse_line(self, line_bytes: bytes, structure: List[str]):
-        decode_errors = "replace"
+
+    @staticmethod
+    def _compile_structure(structure: List[str]) -> tuple:
+        """Pre-lower the column names and locate the normalised fields once.
+
+        ``_parse_line`` used to rebuild the lowered-name dict comprehension
+        (re-lowercasing ~14 column names) for every single row; the schema
+        tuple amortizes that to one pass per .inpx.
+        """
+        lowered = tuple(name.lower() for name in structure)
+
+        def idx(name: str) -> int:
+            try:
+                return lowered.index(name)
+            except ValueError:
+                return -1
+
+        return (
+            lowered,
+            len(lowered),
+            idx("author"),
+            idx("genre"),
+            idx("del"),
+            idx("serno"),
+            idx("size"),
+            idx("libid"),
+        )
+
+    def _decode_block(self, block: bytes) -> str:
+        """Decode a block of lines in one call; per-line fallback on failure."""
+        try:
+            return block.decode(self.encoding)
+        except UnicodeDecodeError:
+            # only genuinely undecodable lines take the fallback encoding
+            return "\n".join(self._decode_line(line) for line in block.split(b"\n"))
+
+    def _decode_line(self, line_bytes: bytes) -> str:
         try:
-            line_str = line_bytes.decode(self.encoding)
+            return line_bytes.decode(self.encoding)
         except UnicodeDecodeError:
-            line_str = line_bytes.decode(self.fallback_encoding, errors=decode_errors)
+            return line_bytes.decode(self.fallback_encoding, errors="replace")
+
+    @staticmethod
+    def _parse_line(line_str: str, schema: tuple):
+        """Turn one decoded .inp line into a row dict (None for blank lines).
+
+        This is the per-row hot path: it is a static method touching no
+        instance state, so everything it does is a C-level str/dict call
+        plus local-variable loads — no attribute or method dispatch per row.
+        """
+        lowered, n_fields, i_author, i_genre, i_del, i_serno, i_size, i_libid = schema
         line_str = line_str.rstrip("\r\n")
         if not line_str:
             return None
-        fields = line_str.split(self.FIELD_SEPARATOR)
-        row = {name.lower(): (fields[i] if i < len(fields) else "") for i, name in enumerate(structure)}
-        # normalise fields as before
-        row["authors"] = self._split_authors(row.get("author", ""))
-        row["genres"] = self._split_many(row.get("genre", ""))
-        row["deleted"] = row.get("del", "") == "1"
-        def _to_int(val: str | None):
-            try:
-                return int(val) if val not in (None, "") else None
-            except ValueError:
-                return None
-        row["serno"] = _to_int(row.get("serno"))
-        row["size"] = _to_int(row.get("size"))
-        row["libid"] = _to_int(row.get("libid"))
+        fields = line_str.split(_FIELD_SEP)
+        if len(fields) < n_fields:
+            fields += [""] * (n_fields - len(fields))
+        row = dict(zip(lowered, fields))
+        # normalise fields as before, addressing them by index; the ":"
+        # split helpers are inlined to skip two bound-method calls per row
+        row["authors"] = [a for a in fields[i_author].split(":") if a] if i_author >= 0 else []
+        row["genres"] = [g for g in fields[i_genre].split(":") if g] if i_genre >= 0 else []
+        row["deleted"] = i_del >= 0 and fields[i_del] == "1"
+        row["serno"] = _to_int(fields[i_serno]) if i_serno >= 0 else None
+        row["size"] = _to_int(fields[i_size]) if i_size >= 0 else None
+        row["libid"] = _to_int(fields[i_libid]) if i_libid >= 0 else None
         return row
 
     def _read_structure(self, zf: zipfile.ZipFile) -> List[str]:
@@ -51,6 +51,31 @@ def _setup_db(tmp_path: Path):
     return db_url, book_id
 
 
+def test_search_matches_more_rows_than_sqlite_parameter_limit(tmp_path):
+    """A broad query must not rebind one SQL variable per matching book."""
+    from sqlalchemy import insert
+
+    db_url = f"sqlite:///{tmp_path / 'big.db'}"
+    init_db(db_url)
+    sess = get_session()
+    n = 33000  # above SQLite's default 32766 host-parameter cap
+    sess.execute(
+        insert(Book),
+        [
+            {"id": i, "title": f"Aardvark {i}", "file_stub": f"b{i}", "file_ext": "fb2", "size": 1}
+            for i in range(1, n + 1)
+        ],
+    )
+    sess.commit()
+    sess.close()
+
+    app = create_app(db_url)
+    app.testing = True
+    client = app.test_client()
+    resp = client.get("/search", query_string={"q": "Aardvark"})
+    assert resp.status_code == 200
+
+
 def test_flask_endpoints(tmp_path):
     db_url, book_id = _setup_db(tmp_path)
     app = create_app(db_url)
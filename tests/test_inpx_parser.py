@@ -28,3 +28,16 @@ def test_inpx_parser_reads_row(tmp_path):
     assert row["authors"] == ["Doe,John,"]
     assert row["size"] == 1234
     assert row["ext"] == "fb2"
+
+
+def test_inpx_parser_handles_missing_eocd(tmp_path):
+    """Some dumps lack the End of Central Directory record entirely."""
+    inpx = _make_fake_inpx(tmp_path)
+    data = inpx.read_bytes()
+    assert data[-22:-18] == b"PK\x05\x06"
+    inpx.write_bytes(data[:-22])  # strip the EOCD record
+
+    rows = list(InpxParser().parse(inpx))
+    assert len(rows) == 1
+    assert rows[0]["title"] == "Sample Book"
+    assert rows[0]["libid"] == 1
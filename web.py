@@ -1,18 +1,122 @@
 """Flask web interface for Flibook."""
 from __future__ import annotations
 
+import functools
 import io
 import logging
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from pathlib import Path
 from typing import List
 
 from flask import Flask, abort, jsonify, render_template, request, send_file, url_for
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, text
 
-from .assembler import assemble_fb2
-from .models import Book, Author, get_session, init_db
+from .archive_extract import open_member
+from .assembler import _zip_handle, assemble_fb2
+from .models import Book, Author, fts_enabled, get_session, init_db
 
 logger = logging.getLogger(__name__)
 
+# pre-built Clark-notation FB2 tags (same scheme as the assembler): iterparse
+# compares raw qualified tag strings, so building them once at import beats a
+# namespace-prefix concatenation per parsed element
+_FB = "{http://www.gribuser.ru/xml/fictionbook/2.0}"
+_PUBLISH_INFO_TAG = f"{_FB}publish-info"
+_BODY_TAG = f"{_FB}body"
+_YEAR_TAG = f"{_FB}year"
+_ANNOTATION_TAG = f"{_FB}annotation"
+_DESCRIPTION_TAG = f"{_FB}description"
+
+
+# central-directory caches: parsing a cover archive's directory costs far
+# more than serving the single member we want, and the archives are immutable
+# in practice — the mtime in the key invalidates stale entries anyway
+@functools.lru_cache(maxsize=32)
+def _index_zip(path: str, mtime: float) -> dict:
+    """Return ``{basename: ZipInfo}`` for every file member of *path*."""
+    zf = _zip_handle(path)  # pooled; central directory parsed once
+    return {
+        Path(zi.filename).name: zi
+        for zi in zf.infolist()
+        if not zi.filename.endswith("/")
+    }
+
+
+@functools.lru_cache(maxsize=8)
+def _index_7z(path: str, mtime: float) -> dict:
+    """Return ``{basename: fullname}`` for every file member of *path*."""
+    while True:
+        zf, lock = _7z_handle(path, mtime)
+        with lock:
+            if getattr(zf, "_flibook_closed", False):
+                continue  # evicted between fetch and lock; fetch a fresh one
+            return {Path(n).name: n for n in zf.getnames() if not n.endswith("/")}
+
+
+# pooled 7z handles (same scheme as the assembler's zip-handle cache): the
+# metadata header sits at the end of a .7z and parsing it dominates small
+# reads, so pay that cost once per archive instead of per HTTP hit.  A
+# *solid* covers.7z still inflates the whole solid block per extraction —
+# only rebuilding the archive non-solid fixes that part.
+#
+# SevenZipFile is stateful (file position + decompressor), so each handle
+# carries its own lock that callers hold for a whole reset-and-read cycle;
+# the module lock only guards the cache dict itself.
+_7Z_CACHE_SIZE = 4
+_7z_cache: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (zf, lock)
+_7z_cache_lock = threading.Lock()
+
+
+def _7z_handle(path: str, mtime: float):
+    """Return a pooled ``(SevenZipFile, lock)`` pair for *path*."""
+    import py7zr  # type: ignore
+
+    key = (path, mtime)
+    evicted = None
+    with _7z_cache_lock:
+        entry = _7z_cache.get(key)
+        if entry is not None:
+            _7z_cache.move_to_end(key)
+            return entry
+        entry = (py7zr.SevenZipFile(path, mode="r"), threading.Lock())
+        _7z_cache[key] = entry
+        if len(_7z_cache) > _7Z_CACHE_SIZE:
+            _, (evicted, evicted_lock) = _7z_cache.popitem(last=False)
+    if evicted is not None:
+        with evicted_lock:  # let an in-flight read finish first
+            # flag before closing: a thread that fetched this entry but has
+            # not locked it yet must re-fetch instead of using a dead handle
+            evicted._flibook_closed = True
+            evicted.close()
+    return entry
+
+
+def _7z_read_bytes(path: str, mtime: float, name: str) -> bytes | None:
+    """Extract one member of the pooled archive *path* into memory.
+
+    py7zr < 1.0 exposes ``read(targets=...)``; 1.x replaced it with
+    ``extract(..., factory=...)``.  requirements.txt allows both.
+    """
+    while True:
+        zf, lock = _7z_handle(path, mtime)
+        with lock:
+            if getattr(zf, "_flibook_closed", False):
+                continue  # evicted between fetch and lock; fetch a fresh one
+            zf.reset()  # rewind after any previous targeted read
+            if hasattr(zf, "read"):
+                extracted = zf.read(targets=[name])
+                if not extracted or name not in extracted:
+                    return None
+                return extracted[name].getvalue()
+            from py7zr.io import BytesIOFactory
+
+            factory = BytesIOFactory(limit=1 << 30)
+            zf.extract(targets=[name], factory=factory)
+            product = factory.products.get(name)
+            return product.read() if product is not None else None
+
 
 def create_app(db_url: str = "sqlite:///flibook.db") -> Flask:  # pragma: no cover
     app = Flask(__name__)
@@ -28,14 +132,32 @@ def create_app(db_url: str = "sqlite:///flibook.db") -> Flask:  # pragma: no cov
         session = get_session()
         if not q:
             return render_template("search.html", books=[])
-        import re
-        tokens = [w for w in re.split(r"\s+", q) if w]
-        if not tokens:
-            return render_template("search.html", books=[])
+        # no-argument str.split is a C-level splitter over any run of
+        # Unicode whitespace — no regex (or per-request re import) needed
+        tokens = q.split()
 
+        if fts_enabled():
+            # FTS5 prefix match over title + authors; the unicode61
+            # tokenizer is already case- and diacritic-insensitive
+            match = " AND ".join('"%s"*' % tok.replace('"', '""') for tok in tokens)
+            # keep the MATCH inside the statement: materializing the rowids
+            # and rebinding them through id.in_([...]) costs one SQL variable
+            # per hit, and a broad prefix query over a full dump blows
+            # SQLite's host-parameter limit
+            matched_ids = text(
+                "SELECT rowid FROM books_fts WHERE books_fts MATCH :m"
+            ).bindparams(m=match)
+            books: List[Book] = (
+                session.query(Book)
+                .filter(Book.id.in_(matched_ids))
+                .order_by(Book.date.desc())
+                .all()
+            )
+            return render_template("search.html", books=books, query=q)
+
+        # non-SQLite fallback: unanchored LIKEs over title and author names
         from sqlalchemy import and_, or_
 
-        import unicodedata
         def variants(word: str) -> list[str]:
             v = [word]
             if word and word[0].isalpha():
@@ -55,15 +177,6 @@ def create_app(db_url: str = "sqlite:///flibook.db") -> Flask:  # pragma: no cov
 
         final_cond = and_(*token_conds)
 
-        books: List[Book] = (
-            session.query(Book)
-            .join(Book.authors)
-            .filter(final_cond)
-            .order_by(Book.date.desc())
-            .distinct()
-            .all()
-        )
-
         books: List[Book] = (
             session.query(Book)
             .join(Book.authors)
@@ -84,45 +197,47 @@ def create_app(db_url: str = "sqlite:///flibook.db") -> Flask:  # pragma: no cov
         # detect cover presence strictly (no fallback)
         cover_exists = False
         if book.cover_archive:
-            from pathlib import Path
-            import zipfile
             arch_path = Path(book.cover_archive)
             try:
                 if arch_path.suffix.lower() == '.zip':
-                    with zipfile.ZipFile(arch_path) as zf:
-                        cover_exists = any(
-                            Path(n).name in {str(book.id), f"{book.id}.jpg"} for n in zf.namelist() if not n.endswith('/')
-                        )
+                    idx = _index_zip(str(arch_path), arch_path.stat().st_mtime)
+                    cover_exists = str(book.id) in idx or f"{book.id}.jpg" in idx
                 elif arch_path.suffix.lower() == '.7z':
-                    import py7zr  # type: ignore
-                    with py7zr.SevenZipFile(arch_path, mode='r') as zf:
-                        cover_exists = any(
-                            Path(n).name in {str(book.id), f"{book.id}.jpg"} for n in zf.getnames() if not n.endswith('/')
-                        )
+                    idx = _index_7z(str(arch_path), arch_path.stat().st_mtime)
+                    cover_exists = str(book.id) in idx or f"{book.id}.jpg" in idx
             except FileNotFoundError:
                 cover_exists = False
 
         annotation_html = None
         if book.fb2_archive:
-            from .archive_extract import open_member
             fb2_name = f"{book.id}.fb2"
             try:
                 with open_member(book.fb2_archive, fb2_name) as fp:
-                    import xml.etree.ElementTree as ET, html
-                    tree = ET.parse(fp)
-                    ns = {
-                        'fb': 'http://www.gribuser.ru/xml/fictionbook/2.0',
-                    }
-                                        # publication year
-                    yr_elem = tree.find('.//fb:publish-info/fb:year', ns)
-                    if yr_elem is not None and yr_elem.text:
-                        pub_year = yr_elem.text.strip()
-                    # annotation
-                    ann = tree.find('.//fb:annotation', ns)
-                    if ann is not None:
+                    ann_elem = None
+                    in_publish = False
+                    # stream-parse: the year and annotation both live inside
+                    # <description>, so stop well before the multi-MB body
+                    for event, elem in ET.iterparse(fp, events=('start', 'end')):
+                        if event == 'start':
+                            if elem.tag == _PUBLISH_INFO_TAG:
+                                in_publish = True
+                            elif elem.tag == _BODY_TAG:
+                                break
+                            continue
+                        if elem.tag == _PUBLISH_INFO_TAG:
+                            in_publish = False
+                        elif in_publish and elem.tag == _YEAR_TAG and elem.text:
+                            pub_year = elem.text.strip()
+                        elif ann_elem is None and elem.tag == _ANNOTATION_TAG:
+                            ann_elem = elem
+                        elif elem.tag == _DESCRIPTION_TAG:
+                            break
+                    if ann_elem is not None:
                         # Simple serialize inner XML to HTML
-                        parts = [ET.tostring(e, encoding='unicode', method='html') for e in ann]
-                        annotation_html = ''.join(parts)
+                        annotation_html = ''.join(
+                            ET.tostring(e, encoding='unicode', method='html')
+                            for e in ann_elem
+                        )
             except FileNotFoundError:
                 pass
         return render_template(
@@ -139,40 +254,28 @@ def create_app(db_url: str = "sqlite:///flibook.db") -> Flask:  # pragma: no cov
         book = session.get(Book, book_id)
         if not book or not book.cover_archive:
             abort(404)
-        import mimetypes
-        from .archive_extract import open_member
-
-        import zipfile
-        from pathlib import Path
         archive_path = Path(book.cover_archive)
         data: bytes | None = None
         if archive_path.suffix.lower() == ".zip":
-            with zipfile.ZipFile(archive_path) as zf:
-                # candidate names: id or id.jpg
-                cand = None
-                for name in zf.namelist():
-                    base = Path(name).name
-                    if base in {str(book_id), f"{book_id}.jpg"}:
-                        cand = name
-                        break
-                if cand is None:
-                    abort(404)
-                with zf.open(cand) as fp:
-                    data = fp.read()
+            idx = _index_zip(str(archive_path), archive_path.stat().st_mtime)
+            # candidate names: id or id.jpg
+            zi = idx.get(str(book_id)) or idx.get(f"{book_id}.jpg")
+            if zi is None:
+                abort(404)
+            # the pooled handle spares re-parsing the central directory;
+            # zipfile serializes concurrent member reads internally
+            zf = _zip_handle(str(archive_path))
+            with zf.open(zi) as fp:
+                data = fp.read()
         elif archive_path.suffix.lower() == ".7z":
-            import py7zr  # type: ignore
-
-            with py7zr.SevenZipFile(archive_path, mode="r") as zf:
-                names = zf.getnames()
-                cand = None
-                for name in names:
-                    base = Path(name).name
-                    if base in {str(book_id), f"{book_id}.jpg"}:
-                        cand = name
-                        break
-                if cand is None:
-                    abort(404)
-                data = zf.read([cand])[cand]
+            mtime = archive_path.stat().st_mtime
+            idx = _index_7z(str(archive_path), mtime)
+            cand = idx.get(str(book_id)) or idx.get(f"{book_id}.jpg")
+            if cand is None:
+                abort(404)
+            data = _7z_read_bytes(str(archive_path), mtime, cand)
+            if data is None:
+                abort(404)
         else:
             abort(404)
 